@@ -0,0 +1,17 @@
+import configparser
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# `utils.util` and `models` need the deployed app-config.ini, Google and Mongo
+# clients at import time; the uploader only uses CONFIG and dedupe_data from them.
+_util = types.ModuleType("utils.util")
+_util.CONFIG = configparser.ConfigParser()
+_util.dedupe_data = lambda data, dedupe_on_fields: data
+sys.modules.setdefault("utils.util", _util)
+
+_models = types.ModuleType("models")
+_models.ProductReview = object
+sys.modules.setdefault("models", _models)
@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from utils.bw_upload import _MAX_BATCH_BYTES, _batch_body, _batch_iter
+
+_SOURCE_ID = 123456789
+
+
+def _mention(i, text_len):
+    return {"guid": str(i), "contents": "x" * text_len, "custom": {"rating": 5}}
+
+
+def _batches(mentions, max_bytes=_MAX_BATCH_BYTES, max_items=1000):
+    envelope_bytes = len(_batch_body([], _SOURCE_ID))
+    batches = _batch_iter(mentions, max_bytes - envelope_bytes, max_items)
+    return [batch for batch, _ in batches]
+
+
+@pytest.mark.parametrize("text_len", [10, 1000, 15990])
+def test_batches_are_valid_json_within_byte_limit(text_len):
+    mentions = [_mention(i, text_len) for i in range(1500)]
+    batches = _batches(mentions, max_bytes=200_000)
+    for batch in batches:
+        body = _batch_body(batch, _SOURCE_ID)
+        assert len(body) <= 200_000
+        assert len(json.loads(body)["items"]) == len(batch)
+    assert sum(len(b) for b in batches) == len(mentions)
+
+
+def test_batches_fill_up_to_byte_limit():
+    mentions = [_mention(i, 1000) for i in range(500)]
+    batches = _batches(mentions, max_bytes=50_000)
+    item_bytes = len(json.dumps(mentions[0], separators=(",", ":")))
+    for batch in batches[:-1]:
+        body_bytes = len(_batch_body(batch, _SOURCE_ID))
+        assert body_bytes <= 50_000 < body_bytes + item_bytes + 1
+
+
+def test_item_count_cap():
+    batches = _batches([_mention(i, 10) for i in range(2500)], max_items=1000)
+    assert [len(b) for b in batches] == [1000, 1000, 500]
+
+
+def test_oversized_item_sent_alone():
+    mentions = [_mention(0, 10), _mention(1, 5000), _mention(2, 10)]
+    batches = _batches(mentions, max_bytes=1000)
+    assert [len(b) for b in batches] == [1, 1, 1]
+    assert len(_batch_body(batches[1], _SOURCE_ID)) > 1000
+    for batch in batches:
+        json.loads(_batch_body(batch, _SOURCE_ID))
+
+
+def test_default_limit():
+    mentions = [_mention(i, 15990) for i in range(1000)]
+    for batch in _batches(mentions):
+        assert len(_batch_body(batch, _SOURCE_ID)) <= _MAX_BATCH_BYTES
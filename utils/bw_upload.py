@@ -1,6 +1,9 @@
+import gzip
 import logging
+import orjson
 import requests
-from typing import Dict, Iterable, List
+import time
+from typing import Dict, Iterable, Iterator, List, Tuple
 
 from models import ProductReview
 from utils.decorators import retry, timeout
@@ -8,6 +11,14 @@ from utils.util import CONFIG, dedupe_data
 
 
 _DEDUPE_ON = ["date", "review_text", "author_name", "review_source"]
+# Upper bound on the uncompressed JSON body of a single upload request
+_MAX_BATCH_BYTES = CONFIG.getint(
+    "brandwatch", "max_batch_bytes", fallback=4 * 1024 * 1024
+)
+_MAX_BATCH_ITEMS = CONFIG.getint("brandwatch", "max_batch_items", fallback=1000)
+# Only enable if the upload endpoint accepts `Content-Encoding: gzip`
+_GZIP_UPLOADS = CONFIG.getboolean("brandwatch", "gzip_uploads", fallback=False)
+_JSON_OPTS = orjson.OPT_SERIALIZE_NUMPY
 
 class BrandwatchUploader:
     _BASE_ENDPOINT = "https://api.brandwatch.com"
@@ -44,9 +55,14 @@ class BrandwatchUploader:
 
     def upload_data(self, data: Iterable[ProductReview], source_id: int):
         data = dedupe_data([row.to_mongo() for row in data], _DEDUPE_ON)
+        rows = [row for row in map(_validated_row, data) if row]
+        mentions = self.as_bw_mentions(rows)
+        envelope_bytes = len(_batch_body([], source_id))
         all_responses = []
-        for batch in _batch_iter(data):
-            response = self._upload_batch(batch, source_id)
+        for batch, encode_secs in _batch_iter(
+            mentions, _MAX_BATCH_BYTES - envelope_bytes, _MAX_BATCH_ITEMS
+        ):
+            response = self._upload_batch(batch, source_id, encode_secs)
             all_responses.append(response)
         return all_responses
 
@@ -72,9 +88,11 @@ class BrandwatchUploader:
 
     @retry(target_exception=Exception, max_retries=3, max_backoff=5)
     @timeout(timeout_max=30)
-    def push_data(self, data: Dict[str, any]) -> Dict[str, any]:
-        logging.info(f"Pushing {len(data['items'])} documents to Brandwatch")
-        response = requests.post(self._UPLOAD, json=data, headers=self.header)
+    def push_data(self, body: bytes, gzipped: bool = False) -> Dict[str, any]:
+        headers = self.header
+        if gzipped:
+            headers = {**headers, "Content-Encoding": "gzip"}
+        response = requests.post(self._UPLOAD, data=body, headers=headers)
         response.raise_for_status()
         return response.json()
 
@@ -93,12 +111,22 @@ class BrandwatchUploader:
             mention["custom"] = custom
         return mention
 
-    def _upload_batch(self, batch_rows: List[dict], source_id: int):
-        data = {"items": [], "contentSource": source_id}
-        for row in batch_rows:
-            mention = self.as_bw_mention(row)
-            data["items"].append(mention)
-        response = self.push_data(data=data)
+    def as_bw_mentions(self, source_rows: Iterable[dict]) -> List[Dict[str, any]]:
+        return [self.as_bw_mention(row) for row in source_rows]
+
+    def _upload_batch(self, batch: List[bytes], source_id: int, encode_secs: float):
+        start = time.perf_counter()
+        body = _batch_body(batch, source_id)
+        raw_bytes = len(body)
+        if _GZIP_UPLOADS:
+            body = gzip.compress(body, compresslevel=6)
+        encode_secs += time.perf_counter() - start
+        logging.info(
+            f"Pushing {len(batch)} documents to Brandwatch: "
+            f"{len(body)} bytes sent ({raw_bytes} uncompressed), "
+            f"encoded in {encode_secs * 1000:.1f}ms"
+        )
+        response = self.push_data(body=body, gzipped=_GZIP_UPLOADS)
         return response
 
 
@@ -118,13 +146,36 @@ def _validated_row(row: Dict[str, any]):
     return row
 
 
-def _batch_iter(all_rows: Iterable[dict], batch_size=1000):
-    batch = []
-    for row in all_rows:
-        if row := _validated_row(row):
-            batch.append(row)
-        if len(batch) == batch_size:
-            yield batch
-            batch = []
+def _batch_body(encoded_items: List[bytes], source_id: int) -> bytes:
+    return b"".join(
+        [
+            b'{"items":[',
+            b",".join(encoded_items),
+            b'],"contentSource":',
+            orjson.dumps(source_id),
+            b"}",
+        ]
+    )
+
+
+def _batch_iter(
+    mentions: Iterable[dict], max_bytes: int, max_items: int = 1000
+) -> Iterator[Tuple[List[bytes], float]]:
+    # A mention larger than max_bytes on its own is still sent, alone
+    batch, batch_bytes, encode_secs = [], 0, 0.0
+    for mention in mentions:
+        start = time.perf_counter()
+        item = orjson.dumps(mention, option=_JSON_OPTS)
+        item_secs = time.perf_counter() - start
+        item_bytes = len(item) + (1 if batch else 0)
+        if batch and (
+            len(batch) == max_items or batch_bytes + item_bytes > max_bytes
+        ):
+            yield batch, encode_secs
+            batch, batch_bytes, encode_secs = [], 0, 0.0
+            item_bytes = len(item)
+        batch.append(item)
+        batch_bytes += item_bytes
+        encode_secs += item_secs
     if batch:
-        yield batch
+        yield batch, encode_secs